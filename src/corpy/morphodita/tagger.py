@@ -16,6 +16,10 @@ class Token(NamedTuple):
     tag: str
 
 
+# A plain (word, lemma, tag) triple, as yielded with ``as_tuple=True``.
+TokenTuple = tuple[str, str, str]
+
+
 class Tagger:
     """A MorphoDiTa morphological tagger and lemmatizer.
 
@@ -23,6 +27,8 @@ class Tagger:
 
     """
 
+    __slots__ = ("_tagger_path", "_tagger", "_morpho", "_has_tokenizer")
+
     _NO_TOKENIZER = (
         "No tokenizer defined for tagger {!r}! Please provide "
         "pre-tokenized and sentence-split input."
@@ -67,6 +73,7 @@ class Tagger:
         sents: Literal[False] = ...,
         guesser: bool = ...,
         convert: str | None = ...,
+        as_tuple: Literal[False] = ...,
     ) -> Iterator[Token]:
         ...
 
@@ -78,6 +85,7 @@ class Tagger:
         sents: Literal[True] = ...,
         guesser: bool = ...,
         convert: str | None = ...,
+        as_tuple: Literal[False] = ...,
     ) -> Iterator[list[Token]]:
         ...
 
@@ -89,9 +97,27 @@ class Tagger:
         sents: bool = ...,
         guesser: bool = ...,
         convert: str | None = ...,
+        as_tuple: Literal[False] = ...,
     ) -> Iterator[Token] | Iterator[list[Token]]:
         ...
 
+    @overload
+    def tag(
+        self,
+        text: str | Iterable[Iterable[str]],
+        *,
+        sents: bool = ...,
+        guesser: bool = ...,
+        convert: str | None = ...,
+        as_tuple: bool = ...,
+    ) -> (
+        Iterator[Token]
+        | Iterator[list[Token]]
+        | Iterator[TokenTuple]
+        | Iterator[list[TokenTuple]]
+    ):
+        ...
+
     def tag(
         self,
         text: str | Iterable[Iterable[str]],
@@ -99,7 +125,13 @@ class Tagger:
         sents: bool = False,
         guesser: bool = False,
         convert: str | None = None,
-    ) -> Iterator[Token] | Iterator[list[Token]]:
+        as_tuple: bool = False,
+    ) -> (
+        Iterator[Token]
+        | Iterator[list[Token]]
+        | Iterator[TokenTuple]
+        | Iterator[list[TokenTuple]]
+    ):
         """Perform morphological tagging and lemmatization on text.
 
         If ``text`` is a string, sentence-split, tokenize and tag that string.
@@ -116,6 +148,10 @@ class Tagger:
             before outputting them. One of ``"pdt_to_conll2009"``,
             ``"strip_lemma_comment"`` or ``"strip_lemma_id"``, or ``None`` if no
             conversion is required.
+        :param as_tuple: If ``True``, yield plain ``(word, lemma, tag)`` tuples
+            instead of :class:`Token` instances. This is somewhat faster when
+            tagging large amounts of text and you don't need access by field
+            name; if you change your mind, ``Token(*tup)`` converts back.
 
         >>> tagger = Tagger("./czech-morfflex-pdt.tagger")
         >>> from pprint import pprint
@@ -147,7 +183,7 @@ class Tagger:
         """
         if isinstance(text, str):
             yield from self.tag_untokenized(
-                text, sents=sents, guesser=guesser, convert=convert
+                text, sents=sents, guesser=guesser, convert=convert, as_tuple=as_tuple
             )
         # The other accepted type of input is an iterable of iterables of
         # strings, but we only do a partial check whether the top-level object
@@ -157,7 +193,7 @@ class Tagger:
         # tagging each character separately) occurs in ``Tagger.tag_tokenized()``.
         elif isinstance(text, Iterable):
             yield from self.tag_tokenized(
-                text, sents=sents, guesser=guesser, convert=convert
+                text, sents=sents, guesser=guesser, convert=convert, as_tuple=as_tuple
             )
         else:
             raise TypeError(self._TEXT_REQS)
@@ -170,6 +206,7 @@ class Tagger:
         sents: Literal[False] = ...,
         guesser: bool = ...,
         convert: str | None = ...,
+        as_tuple: Literal[False] = ...,
     ) -> Iterator[Token]:
         ...
 
@@ -181,6 +218,7 @@ class Tagger:
         sents: Literal[True] = ...,
         guesser: bool = ...,
         convert: str | None = ...,
+        as_tuple: Literal[False] = ...,
     ) -> Iterator[list[Token]]:
         ...
 
@@ -192,9 +230,27 @@ class Tagger:
         sents: bool = ...,
         guesser: bool = ...,
         convert: str | None = ...,
+        as_tuple: Literal[False] = ...,
     ) -> Iterator[Token] | Iterator[list[Token]]:
         ...
 
+    @overload
+    def tag_untokenized(
+        self,
+        text: str,
+        *,
+        sents: bool = ...,
+        guesser: bool = ...,
+        convert: str | None = ...,
+        as_tuple: bool = ...,
+    ) -> (
+        Iterator[Token]
+        | Iterator[list[Token]]
+        | Iterator[TokenTuple]
+        | Iterator[list[TokenTuple]]
+    ):
+        ...
+
     def tag_untokenized(
         self,
         text: str,
@@ -202,7 +258,13 @@ class Tagger:
         sents: bool = False,
         guesser: bool = False,
         convert: str | None = None,
-    ) -> Iterator[Token] | Iterator[list[Token]]:
+        as_tuple: bool = False,
+    ) -> (
+        Iterator[Token]
+        | Iterator[list[Token]]
+        | Iterator[TokenTuple]
+        | Iterator[list[TokenTuple]]
+    ):
         """This is the method :meth:`tag` delegates to when `text` is a string.
         See docstring for :meth:`tag` for details about parameters.
 
@@ -220,6 +282,7 @@ class Tagger:
             sents,
             self._morpho.GUESSER if guesser else self._morpho.NO_GUESSER,
             converter,
+            as_tuple,
             forms,
             tagged_lemmas,
             token_ranges,
@@ -233,6 +296,7 @@ class Tagger:
         sents: Literal[False] = ...,
         guesser: bool = ...,
         convert: str | None = ...,
+        as_tuple: Literal[False] = ...,
     ) -> Iterator[Token]:
         ...
 
@@ -244,6 +308,7 @@ class Tagger:
         sents: Literal[True] = ...,
         guesser: bool = ...,
         convert: str | None = ...,
+        as_tuple: Literal[False] = ...,
     ) -> Iterator[list[Token]]:
         ...
 
@@ -255,9 +320,27 @@ class Tagger:
         sents: bool = ...,
         guesser: bool = ...,
         convert: str | None = ...,
+        as_tuple: Literal[False] = ...,
     ) -> Iterator[Token] | Iterator[list[Token]]:
         ...
 
+    @overload
+    def tag_tokenized(
+        self,
+        text: Iterable[Iterable[str]],
+        *,
+        sents: bool = ...,
+        guesser: bool = ...,
+        convert: str | None = ...,
+        as_tuple: bool = ...,
+    ) -> (
+        Iterator[Token]
+        | Iterator[list[Token]]
+        | Iterator[TokenTuple]
+        | Iterator[list[TokenTuple]]
+    ):
+        ...
+
     def tag_tokenized(
         self,
         text: Iterable[Iterable[str]],
@@ -265,7 +348,13 @@ class Tagger:
         sents: bool = False,
         guesser: bool = False,
         convert: str | None = None,
-    ) -> Iterator[Token] | Iterator[list[Token]]:
+        as_tuple: bool = False,
+    ) -> (
+        Iterator[Token]
+        | Iterator[list[Token]]
+        | Iterator[TokenTuple]
+        | Iterator[list[TokenTuple]]
+    ):
         """This is the method :meth:`tag` delegates to when `text` is an
         iterable of iterables of strings. See docstring for :meth:`tag` for
         details about parameters.
@@ -273,6 +362,7 @@ class Tagger:
         """
         vtokenizer = ufal.Tokenizer.newVerticalTokenizer()
         converter = self._get_converter(convert)
+        guesser_mode = self._morpho.GUESSER if guesser else self._morpho.NO_GUESSER
         forms = ufal.Forms()
         tagged_lemmas = ufal.TaggedLemmas()
         token_ranges = ufal.TokenRanges()
@@ -286,8 +376,9 @@ class Tagger:
             yield from self._tag(
                 vtokenizer,
                 sents,
-                self._morpho.GUESSER if guesser else self._morpho.NO_GUESSER,
+                guesser_mode,
                 converter,
+                as_tuple,
                 forms,
                 tagged_lemmas,
                 token_ranges,
@@ -300,6 +391,7 @@ class Tagger:
         sents: Literal[False],
         guesser: int,
         converter: ufal.TagsetConverter | None,
+        as_tuple: Literal[False],
         forms: ufal.Forms,
         tagged_lemmas: ufal.TaggedLemmas,
         token_ranges: ufal.TokenRanges,
@@ -313,6 +405,7 @@ class Tagger:
         sents: Literal[True],
         guesser: int,
         converter: ufal.TagsetConverter | None,
+        as_tuple: Literal[False],
         forms: ufal.Forms,
         tagged_lemmas: ufal.TaggedLemmas,
         token_ranges: ufal.TokenRanges,
@@ -326,10 +419,16 @@ class Tagger:
         sents: bool,
         guesser: int,
         converter: ufal.TagsetConverter | None,
+        as_tuple: bool,
         forms: ufal.Forms,
         tagged_lemmas: ufal.TaggedLemmas,
         token_ranges: ufal.TokenRanges,
-    ) -> Iterator[Token] | Iterator[list[Token]]:
+    ) -> (
+        Iterator[Token]
+        | Iterator[list[Token]]
+        | Iterator[TokenTuple]
+        | Iterator[list[TokenTuple]]
+    ):
         ...
 
     def _tag(
@@ -338,20 +437,40 @@ class Tagger:
         sents: bool,
         guesser: int,
         converter: ufal.TagsetConverter | None,
+        as_tuple: bool,
         forms: ufal.Forms,
         tagged_lemmas: ufal.TaggedLemmas,
         token_ranges: ufal.TokenRanges,
-    ) -> Iterator[Token] | Iterator[list[Token]]:
-        while tokenizer.nextSentence(forms, token_ranges):
-            self._tagger.tag(forms, tagged_lemmas, guesser)
-            sent = [] if sents else None
-            for tagged_lemma, word in zip(tagged_lemmas, forms):
-                if converter is not None:
+    ) -> (
+        Iterator[Token]
+        | Iterator[list[Token]]
+        | Iterator[TokenTuple]
+        | Iterator[list[TokenTuple]]
+    ):
+        # bind the SWIG methods called on every sentence to locals, so that they
+        # aren't looked up (and bound) anew on each iteration
+        next_sentence = tokenizer.nextSentence
+        tag = self._tagger.tag
+        while next_sentence(forms, token_ranges):
+            tag(forms, tagged_lemmas, guesser)
+            # NOTE: Branch on converter and as_tuple once per sentence rather
+            # than once per token. Iterating over tagged_lemmas yields copies
+            # of the underlying C++ objects, so the converted lemmas must be
+            # collected; converting them in a separate pass would have no effect.
+            if converter is None:
+                lemmas = tagged_lemmas
+            else:
+                lemmas = []
+                for tagged_lemma in tagged_lemmas:
                     converter.convert(tagged_lemma)
-                token = Token(word, tagged_lemma.lemma, tagged_lemma.tag)
-                if sent is not None:
-                    sent.append(token)
-                else:
-                    yield token
-            if sent is not None:
+                    lemmas.append(tagged_lemma)
+            if as_tuple:
+                sent = [(word, tl.lemma, tl.tag) for tl, word in zip(lemmas, forms)]
+            else:
+                sent = [
+                    Token(word, tl.lemma, tl.tag) for tl, word in zip(lemmas, forms)
+                ]
+            if sents:
                 yield sent
+            else:
+                yield from sent
@@ -29,6 +29,8 @@ class Tokenizer:
 
     """
 
+    __slots__ = ("tokenizer_constructor",)
+
     def __init__(self, tokenizer_type: str):
         constructor_name = "new" + tokenizer_type.capitalize() + "Tokenizer"
         self.tokenizer_constructor = getattr(ufal.Tokenizer, constructor_name)
@@ -96,8 +98,13 @@ class Tokenizer:
         token_ranges = ufal.TokenRanges()
         tokenizer = self.tokenizer_constructor()
         tokenizer.setText(text)
-        while tokenizer.nextSentence(forms, token_ranges):
-            if sents:
+        next_sentence = tokenizer.nextSentence
+        # NOTE: list(forms) is already a single pass over the SWIG vector's
+        # iterator, so there's not much to gain there; but we can at least
+        # decide on sents once instead of on every sentence.
+        if sents:
+            while next_sentence(forms, token_ranges):
                 yield list(forms)
-            else:
+        else:
+            while next_sentence(forms, token_ranges):
                 yield from forms
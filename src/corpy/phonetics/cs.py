@@ -5,14 +5,19 @@ orthography-to-phonetics mapping are overridden using a pronunciation
 lexicon.
 
 """
+from __future__ import annotations
 import logging
+import sys
 import warnings
 import unicodedata as ud
 from functools import lru_cache
+from itertools import chain
 from operator import itemgetter
 from pathlib import Path
 from typing import (
+    TYPE_CHECKING,
     cast,
+    Any,
     Dict,
     Iterable,
     Iterator,
@@ -25,9 +30,17 @@ from typing import (
 
 import regex as re
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from corpy.util import longest_common_substring
-from corpy.morphodita import Token, Tagger
-from ufal.morphodita import DerivationFormatter
+
+# MorphoDiTa is only needed when transcribing with a tagger, and in that case,
+# the user has already imported it anyway
+if TYPE_CHECKING:
+    from corpy.morphodita import Token, Tagger
 
 LOG = logging.getLogger(__name__)
 
@@ -50,7 +63,7 @@ def _load_phones(tsv: str) -> Dict[str, Dict[str, str]]:
     header.pop(0)
     for line_ in _filter_comments(lines):
         line = line_.split("\t")
-        key = line.pop(0)
+        key = sys.intern(line.pop(0))
         val = ans.setdefault(key, {})
         for alphabet_id, symbol in zip(header, line):
             val[alphabet_id] = symbol
@@ -66,7 +79,7 @@ def _load_substr2phones(tsv: str, allowed: Dict) -> Dict[str, List[str]]:
         phones_for_substr = ans.setdefault(substr, [])
         for phone in phones.split():
             assert phone in allowed, f"Unexpected phone {phone!r}"
-            phones_for_substr.append(phone)
+            phones_for_substr.append(sys.intern(phone))
     return ans
 
 
@@ -77,7 +90,7 @@ def _load_voicing_pairs(
     lines = tsv.splitlines()
     lines.pop(0)
     for line in _filter_comments(lines):
-        devoiced, voiced = line.split("\t")
+        devoiced, voiced = map(sys.intern, line.split("\t"))
         assert devoiced in allowed, f"Unexpected phone {devoiced!r}"
         assert voiced in allowed, f"Unexpected phone {voiced!r}"
         devoiced2voiced[devoiced] = voiced
@@ -90,55 +103,163 @@ def _load_voicing_pairs(
     return devoiced2voiced, voiced2devoiced, trigger_voicing, trigger_devoicing
 
 
+def _fuse_hiatus_and_degemination(
+    substr2phones: Dict[str, List[str]]
+) -> Dict[str, List[str]]:
+    """Bake hiatus insertion and degemination into substring keys.
+
+    Instead of rewriting each word with two extra regex passes before splitting
+    it into substrings, add keys which match the original spelling and map
+    directly onto the phones the rewritten spelling would yield, so that one
+    leftmost-longest scan does all the work.
+
+    """
+    # NOTE: short vowels are exempt from degemination, cf. <pootevřít>; cf. no
+    # gemination below for the phonetic counterpart of this rule
+    vowels = "aeoiuy"
+
+    def geminated(substr: str) -> Iterator[str]:
+        first, last = substr[0], substr[-1]
+        heads = [substr] if first in vowels else [substr, first + substr]
+        for head in heads:
+            yield head
+            if len(substr) > 1 and last not in vowels:
+                yield head + last
+
+    ans: Dict[str, List[str]] = {}
+    for substr, phones in substr2phones.items():
+        for key in geminated(substr):
+            ans[key] = phones
+    # force hiatus in <[iy][ií]> sequences, including when the first vowel is
+    # part of a longer substring like <ti>; <y> is there because exceptions can
+    # insert it in place of <i> to prevent palatalization
+    for vowel in "iy":
+        heads = [vowel] + [s for s in substr2phones if len(s) == 2 and s[1] == vowel]
+        for head in heads:
+            for tail in "ií":
+                phones = substr2phones[head] + substr2phones["j"] + substr2phones[tail]
+                for key in geminated(head + tail):
+                    ans[key] = phones
+    return ans
+
+
 def _create_substr_re(substr_list: Iterable[str]) -> re.Pattern:
     substr_list = sorted(substr_list, key=len, reverse=True) + ["."]
     return re.compile("|".join(substr_list))
 
 
+def _create_substr_trie(substr2phones: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Build a trie of substrings as nested dicts keyed by characters.
+
+    The phones for a substring are stored under the ``""`` key of the node where
+    it ends.
+
+    """
+    trie: Dict[str, Any] = {}
+    for substr, phones in substr2phones.items():
+        node = trie
+        for char in substr:
+            node = node.setdefault(char, {})
+        node[""] = phones
+    return trie
+
+
+def _create_substr_automaton(substr2phones: Dict[str, List[str]]):
+    """Build an Aho–Corasick automaton equivalent to ``SUBSTR_TRIE``, if possible.
+
+    Requires the optional ``pyahocorasick`` package; if it's not available,
+    ``None`` is returned and ``SUBSTR_TRIE`` is used instead.
+
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for substr, phones in substr2phones.items():
+        automaton.add_word(substr, (len(substr), phones))
+    automaton.make_automaton()
+    return automaton
+
+
 class _ExceptionRewriter:
     def __init__(self, tsv: str):
         lines = tsv.splitlines()
         lines.pop(0)
-        rules = []
+        literal_rules = []
+        context_rules = []
         for line in _filter_comments(lines):
             pat, rewrite = line.split("\t")
-            pat = f"(?P<x>{pat})" if "(" not in pat else pat
+            # most rules are plain literal strings, which can be looked up in a
+            # dict; only the few which specify context around the substring to
+            # rewrite need the regex engine
+            if "(" not in pat:
+                literal_rules.append((pat, rewrite))
+                continue
             match = re.search(r"\(\?P<x>(.*?)\)", pat)
             assert match is not None
             orig = match.group(1)
-            rules.append((pat, orig, rewrite))
-        # reverse sort by length of substring matched, so that longest match
-        # applies
-        rules.sort(key=itemgetter(1), reverse=True)
-        # allow trailing hyphens -- _rewrite allows multiple rewrites only if
-        # they're contiguous from the beginning of the string, but hyphens
-        # are special, so just skip over them
-        re_str = "(" + "|".join(pat for (pat, _, _) in rules) + ")-*"
-        self._re = re.compile(re_str)
-        self._orig2rewrite: Dict[str, str] = {
-            orig: rewrite for (_, orig, rewrite) in rules
+            context_rules.append((pat, orig, rewrite))
+        self._literal2rewrite: Dict[str, str] = dict(literal_rules)
+        # reverse sort by substring matched, so that when several context rules
+        # match at the same position, the one with the longest substring wins
+        context_rules.sort(key=itemgetter(1), reverse=True)
+        self._context_re = re.compile("|".join(pat for (pat, _, _) in context_rules))
+        self._context2rewrite: Dict[str, str] = {
+            orig: rewrite for (_, orig, rewrite) in context_rules
+        }
+        # all prefixes of substrings to rewrite, so that candidate rules can be
+        # found by extending the substring at a given position one character at
+        # a time, stopping as soon as it isn't a prefix of anything
+        self._prefixes = {
+            orig[:i]
+            for orig in chain(self._literal2rewrite, self._context2rewrite)
+            for i in range(1, len(orig) + 1)
         }
 
+    def _match(self, string: str, pos: int) -> Optional[Tuple[str, str, int]]:
+        """Find the rule which applies at `pos` in `string`, if any.
+
+        Returns the substring to rewrite, what to rewrite it with, and the end
+        of the match (which may extend beyond the substring if the rule
+        specifies context after it).
+
+        """
+        literal = None
+        context = False
+        end = pos + 1
+        while end <= len(string) and (substr := string[pos:end]) in self._prefixes:
+            if substr in self._literal2rewrite:
+                literal = substr
+            if substr in self._context2rewrite:
+                context = True
+            end += 1
+        # NOTE: The substring to rewrite always starts at the beginning of the
+        # match, so all candidates at pos are prefixes of each other and the
+        # longest one is the most specific.
+        match = self._context_re.match(string, pos) if context else None
+        if match is not None:
+            orig = match.group("x")
+            if literal is None or len(orig) > len(literal):
+                return orig, self._context2rewrite[orig], match.end()
+        if literal is not None:
+            return literal, self._literal2rewrite[literal], pos + len(literal)
+        return None
+
     @lru_cache()
     def _sub(self, string: str) -> str:
-        self._at = 0
-        return self._re.sub(self._rewrite, string)
-
-    def _rewrite(self, match) -> str:
-        # entire match
-        matched = match.group()
         # multiple rewrites are allowed, but they must be contiguous and start
-        # at the beginning of the string; otherwise, the match is returned
-        # unchanged
-        if match.start() == self._at:
-            self._at += len(matched)
-        else:
-            return matched
-        # the part of the match we want to replace
-        orig = match.group("x")
-        # what we want to replace it with
-        rewrite = self._orig2rewrite[orig]
-        return matched.replace(orig, rewrite, 1)
+        # at the beginning of the string
+        output = []
+        pos = 0
+        while (rule := self._match(string, pos)) is not None:
+            orig, rewrite, end = rule
+            # allow trailing hyphens -- they're special, so just skip over them
+            while string[end : end + 1] == "-":
+                end += 1
+            output.append(rewrite)
+            output.append(string[pos + len(orig) : end])
+            pos = end
+        output.append(string[pos:])
+        return "".join(output)
 
 
 #
@@ -166,13 +287,123 @@ SUBSTR2PHONES = _load_substr2phones(
     ),  # pylint: disable=E1101
     PHONES,
 )
+# NOTE: No longer used for transcription, which goes through the trie or the
+# automaton below, but kept for backwards compatibility.
 SUBSTR_RE = _create_substr_re(SUBSTR2PHONES.keys())
+FUSED_SUBSTR2PHONES = _fuse_hiatus_and_degemination(SUBSTR2PHONES)
+SUBSTR_TRIE = _create_substr_trie(FUSED_SUBSTR2PHONES)
+SUBSTR_AUTOMATON = _create_substr_automaton(FUSED_SUBSTR2PHONES)
 REWRITER = _ExceptionRewriter(
     DIR.with_name("exceptions.tsv").read_text(encoding="utf-8")  # pylint: disable=E1101
 )
+HIGH_FRONT_VOWELS = frozenset("Ii")
+VOWELS = frozenset("aEIoui")
+SHORT_VOWELS = frozenset("aEIou")
+ALPHA_TOKEN_RE = re.compile(r"[\p{Alphabetic}\-]*\p{Alphabetic}[\p{Alphabetic}\-]*")
+
+
+def _substr2phones_trie(word: str) -> Iterator[List[str]]:
+    # NOTE: Walking the trie in Python is faster than matching an alternation of
+    # all the substrings with the regex engine, though not quite as fast as the
+    # Aho–Corasick automaton.
+    pos, length = 0, len(word)
+    while pos < length:
+        node = SUBSTR_TRIE
+        i = pos
+        end = phones = None
+        # find the longest substring starting at pos
+        while i < length and (node := node.get(word[i])) is not None:
+            i += 1
+            if "" in node:
+                end, phones = i, node[""]
+        if end is None:
+            raise ValueError(f"Unexpected substring in input: {word[pos]!r}")
+        yield phones
+        pos = end
+
+
+def _substr2phones_automaton(word: str) -> Iterator[List[str]]:
+    # iter_long yields leftmost-longest non-overlapping matches, which is what
+    # the trie walk does too, except that it skips over characters which aren't
+    # covered by any key instead of stopping there
+    pos = 0
+    for end, (length, phones) in SUBSTR_AUTOMATON.iter_long(word):
+        if end - length + 1 != pos:
+            break
+        yield phones
+        pos = end + 1
+    if pos != len(word):
+        raise ValueError(f"Unexpected substring in input: {word[pos]!r}")
+
+
+_substr2phones = (
+    _substr2phones_trie if SUBSTR_AUTOMATON is None else _substr2phones_automaton
+)
+
+
+# word frequencies are Zipfian, so most words in a text will have been seen
+# before; only CSPs need to be redone each time, because they depend on context
+@lru_cache(maxsize=100_000)
+def _word2phones(word: str) -> Tuple[str, ...]:
+    word = word.lower()
+    # rewrite exceptions
+    word = REWRITER._sub(word)
+    # hiatus insertion and degemination are handled by the substring table, cf.
+    # _fuse_hiatus_and_degemination
+    return tuple(ph for phones in _substr2phones(word) for ph in phones)
+
+
+@lru_cache()
+def _phone2symbol(alphabet: str) -> Dict[str, str]:
+    """Map phones to their symbols in `alphabet` (lowercase)."""
+    return {
+        phone: symbols[alphabet]
+        for phone, symbols in PHONES.items()
+        if alphabet in symbols
+    }
+
+
+# word forms and lemmas are Zipfian too, so the same pairs come up over and over
+@lru_cache(maxsize=200_000)
+def _prefix_boundary(lower: str, lemma: str) -> Optional[int]:
+    """Find a prefix boundary in word form `lower` based on `lemma` from its path.
+
+    Both arguments should be lowercase. Returns the index of the boundary, or
+    ``None`` if `lemma` doesn't identify a relevant one.
+
+    """
+    # NOTE: A boundary can only be found where the common substring starts,
+    # i.e. at a position where the word form has the first character of the
+    # lemma, so first look for such a position that would also satisfy the
+    # final condition below. Most pairs have none, and the LCS needn't be
+    # computed at all.
+    first = lemma[:1]
+    i = lower.find(first, 1) if first else -1
+    while i != -1 and first != "u" and lower[i - 1] not in "iíyý":
+        i = lower.find(first, i + 1)
+    if i == -1:
+        return None
+    lcs = longest_common_substring(lower, lemma)
+    LOG.debug("word: %r, lemma: %r, lcs: %r", lower, lemma, lcs)
+    if (
+        lcs
+        # we only care about lemmas in the derivation path that allow us to
+        # identify prefixes, i.e. where the common substring *does not* start
+        # at the beginning of the word form...
+        and (i := lcs.start1) > 0
+        # but it *must* start at the beginning of the lemma (otherwise word
+        # form doutník derived from lemma dutý will be "morpheme"-split as
+        # do-utník because of LCS -ut-, which is rubbish)
+        and lcs.start2 == 0
+        # currently, we're only aiming to prevent *u diphthongs and hiatus
+        # insertion across morpheme boundaries; in the future, if we add an
+        # option to insert glottal stops, this will have to be reworked
+        and (lower[i] == "u" or lower[i - 1] in "iíyý")
+    ):
+        return i
+    return None
 
 
-#
 #
 # ------------------------------------------------------------------- Public API {{{1
 
@@ -186,6 +417,8 @@ class Phone:
 
     """
 
+    __slots__ = ("value", "word_boundary")
+
     def __init__(self, value: str, *, word_boundary: bool = False):
         self.value: str = value
         self.word_boundary = word_boundary
@@ -245,6 +478,8 @@ class ProsodicUnit:
     ) -> List[str]:
         if tagger is None:
             return input_
+        from ufal.morphodita import DerivationFormatter
+
         deriv = DerivationFormatter.newPathDerivationFormatter(
             tagger._tagger.getMorpho().getDerivator()
         )
@@ -259,31 +494,13 @@ class ProsodicUnit:
 
         output = []
         for token in cast(
-            Iterator[Token], tagger.tag([input_], convert="strip_lemma_id")
+            "Iterator[Token]", tagger.tag([input_], convert="strip_lemma_id")
         ):
             word = token.word
             lower = word.lower()
             for lemma in deriv.formatDerivation(token.lemma).split():
-                lcs = longest_common_substring(lower, lemma.lower())
-                LOG.debug("word: %r, lemma: %r, lcs: %r", word, lemma, lcs)
-                if (
-                    lcs
-                    # we only care about lemmas in the derivation path that
-                    # allow us to identify prefixes, i.e. where the common
-                    # substring *does not* start at the beginning of the word
-                    # form...
-                    and (i := lcs.start1) > 0
-                    # but it *must* start at the beginning of the lemma
-                    # (otherwise word form doutník derived from lemma dutý will
-                    # be "morpheme"-split as do-utník because of LCS -ut-, which
-                    # is rubbish)
-                    and lcs.start2 == 0
-                    # currently, we're only aiming to prevent *u diphthongs and
-                    # hiatus insertion across morpheme boundaries; in the
-                    # future, if we add an option to insert glottal stops, this
-                    # will have to be reworked
-                    and (lower[i] == "u" or lower[i - 1] in "iíyý")
-                ):
+                i = _prefix_boundary(lower, lemma.lower())
+                if i is not None:
                     word = word[:i] + "-" + word[i:]
             output.append(word)
         return output
@@ -298,25 +515,7 @@ class ProsodicUnit:
         """
         output: List[Phone] = []
         for word in input_:
-            word = word.lower()
-            # rewrite exceptions
-            word = REWRITER._sub(word)
-            # force hiatus in <i[ií]> sequences; <y> is there because the
-            # exceptions above can insert it in place of <i> to prevent
-            # palatalization
-            word = re.sub(r"([iy])([ií])", r"\1j\2", word)
-            # remove duplicate graphemes (except for short vowels, cf. <pootevřít>)
-            # cf. no gemination below for the phonetic counterpart of this rule
-            word = re.sub(r"([^aeoiuy])\1", r"\1", word)
-            for match in SUBSTR_RE.finditer(word.lower()):
-                substr = match.group()
-                try:
-                    phones = SUBSTR2PHONES[substr]
-                except KeyError as err:
-                    raise ValueError(
-                        f"Unexpected substring in input: {substr!r}"
-                    ) from err
-                output.extend(Phone(ph) for ph in phones)
+            output.extend(Phone(ph) for ph in _word2phones(word))
             output[-1].word_boundary = True
         return output
 
@@ -327,30 +526,28 @@ class ProsodicUnit:
         Usually regressive, but P\ assimilates progressively as well.
 
         """
-        output = []
-        previous_phone = EMPTY_PHONE
+        # NOTE: The phones are modified in place, so there's no need to build
+        # a new list. Assimilation can propagate through a cluster, so each
+        # phone depends on the already assimilated one after it, which rules out
+        # vectorizing this pass.
+        previous = ""
         for phone in reversed(input_):
-            if previous_phone.value in TRIGGER_VOICING:
-                phone.value = DEVOICED2VOICED.get(phone.value, phone.value)
-            elif phone.word_boundary or previous_phone.value in TRIGGER_DEVOICING:
-                phone.value = VOICED2DEVOICED.get(phone.value, phone.value)
+            value = phone.value
+            if previous in TRIGGER_VOICING:
+                value = phone.value = DEVOICED2VOICED.get(value, value)
+            elif phone.word_boundary or previous in TRIGGER_DEVOICING:
+                value = phone.value = VOICED2DEVOICED.get(value, value)
             # for P\, the assimilation works the other way round too
-            elif previous_phone.value == "P\\" and phone.value in TRIGGER_DEVOICING:
+            elif previous == "P\\" and value in TRIGGER_DEVOICING:
                 previous_phone.value = "Q\\"
-            output.append(phone)
-            previous_phone = phone
-        output.reverse()
-        return output
+            previous_phone, previous = phone, value
+        return input_
 
     @staticmethod
     def _other_csps(input_: List[Phone], *, hiatus=False) -> List[Phone]:
         """Perform other connected speech processes."""
         output = []
-        for i, phone in enumerate(input_):
-            try:
-                next_ph = input_[i + 1]
-            except IndexError:
-                next_ph = EMPTY_PHONE
+        for phone, next_ph in zip(input_, input_[1:] + [EMPTY_PHONE]):
             # assimilation of place for nasals
             if phone.value == "n" and next_ph.value in ("k", "g"):
                 phone.value = "N"
@@ -361,7 +558,7 @@ class ProsodicUnit:
             # orthographic counterpart of this rule
             elif (
                 phone.value == next_ph.value
-                and phone.value not in "aEIou"
+                and phone.value not in SHORT_VOWELS
                 and not phone.word_boundary
             ):
                 continue
@@ -372,8 +569,8 @@ class ProsodicUnit:
             # optionally add transient /j/ between high front vowel and subsequent vowel
             if (
                 hiatus
-                and re.match("[Ii]", phone.value)
-                and re.match("[aEIoui]", next_ph.value)
+                and phone.value[:1] in HIGH_FRONT_VOWELS
+                and next_ph.value[:1] in VOWELS
             ):
                 output.append(Phone("j"))
         return output
@@ -384,15 +581,34 @@ class ProsodicUnit:
     ) -> List[Tuple[str, ...]]:
         output = []
         word = []
-        alphabet = alphabet.lower()
+        # phones which have no symbol in the alphabet are left as is
+        translate = _phone2symbol(alphabet.lower()).get
         for phone in input_:
-            word.append(PHONES.get(phone.value, {}).get(alphabet, phone.value))
+            value = phone.value
+            word.append(translate(value, value))
             if phone.word_boundary:
                 output.append(tuple(word))
                 word = []
         return output
 
 
+def _is_transcribable(token: str) -> bool:
+    """Check whether `token` consists of alphabetic characters and hyphens only.
+
+    Equivalent to a full match of ``ALPHA_TOKEN_RE``, but the common cases are
+    answered by str methods, without involving the regex engine.
+
+    """
+    letters = token.replace("-", "")
+    if letters.isalpha():
+        return True
+    # \p{Alphabetic} is a superset of what str.isalpha accepts (it includes
+    # e.g. some combining marks), but not within ASCII
+    if letters.isascii():
+        return False
+    return ALPHA_TOKEN_RE.fullmatch(token) is not None
+
+
 def _separate_tokens(
     tokens: List[str], prosodic_boundary_symbols: Set[str]
 ) -> Tuple[List[Optional[str]], List[str]]:
@@ -406,7 +622,7 @@ def _separate_tokens(
     matrix: List[Optional[str]] = []
     to_transcribe = []
     for token in tokens:
-        if re.fullmatch(r"[\p{Alphabetic}\-]*\p{Alphabetic}[\p{Alphabetic}\-]*", token):
+        if _is_transcribable(token):
             # instead of simply checking for a final hyphen in the outer
             # condition and silently shoving an otherwise transcribable token
             # into matrix, it's better to fail and alert the user they probably
@@ -501,7 +717,10 @@ def transcribe(
     transcribed = ProsodicUnit(to_transcribe).phonetic(
         alphabet=alphabet, hiatus=hiatus, tagger=tagger
     )
-    return [m if m is not None else transcribed.pop(0) for m in matrix]
+    # NOTE: Don't pop transcribed tokens off the front of the list, that's
+    # quadratic in the length of the phrase.
+    transcribed_iter = iter(transcribed)
+    return [m if m is not None else next(transcribed_iter) for m in matrix]
 
 
 # vi: set foldmethod=marker:
@@ -17,10 +17,31 @@ LOGLEVELS = [
     )
 ]
 NORM_FORMS = ("NFC", "NFD", "NFKC", "NFKD")
+EGC_RE = re.compile(r"\X")
+# fragments are counted in chunks of at least this many characters, because
+# calling into the regex engine once per (typically short) fragment is slow
+CHUNK_SIZE = 1 << 16
+# the information separator two (a.k.a. record separator) is a control
+# character, which means it always forms an extended grapheme cluster of its
+# own, so it can delimit fragments in a chunk without gluing together clusters
+# from neighboring fragments
+FRAGMENT_SEP = "\x1e"
 
 
 def count_extended_grapheme_clusters(text):
-    return Counter(m.group() for m in re.finditer(r"\X", text))
+    return Counter(EGC_RE.findall(text))
+
+
+def chunk(fragments, size=CHUNK_SIZE):
+    batch, batch_size = [], 0
+    for fragment in fragments:
+        batch.append(fragment)
+        batch_size += len(fragment)
+        if batch_size >= size:
+            yield batch
+            batch, batch_size = [], 0
+    if batch:
+        yield batch
 
 
 def check_normalization(fdist, expected_form="NFC"):
@@ -37,17 +58,36 @@ def check_normalization(fdist, expected_form="NFC"):
 def parse(file, xml=False):
     if xml:
         LOG.info(f"Parsing {file.name!r} as XML.")
-        tree = etree.parse(file)
-        for elem in tree.iter():
-            yield from elem.attrib.values()
-            yield elem.text
-            yield elem.tail
+        # NOTE: The document is streamed instead of parsed into a tree, which
+        # might not fit into memory for large corpora. A node's tail isn't
+        # available yet when the node ends, so it's only yielded once the next
+        # sibling or the parent ends, after which the node is discarded.
+        # Unlike etree.parse, iterparse only reads bytes.
+        source = getattr(file, "buffer", file)
+        for _, node in etree.iterparse(source, events=("end", "comment", "pi")):
+            parent = node.getparent()
+            # skip comments and processing instructions outside the root element
+            if parent is None and not isinstance(node.tag, str):
+                continue
+            yield from node.attrib.values()
+            yield node.text
+            if len(node):
+                yield node[-1].tail
+            node.clear(keep_tail=True)
+            if parent is not None:
+                while (previous := node.getprevious()) is not None:
+                    yield previous.tail
+                    del parent[0]
     else:
         yield from file
 
 
-def print_fdist(fdist):
-    for extended_grapheme_cluster, count in fdist.most_common():
+def print_fdist(fdist, sort_ties=False):
+    if sort_ties:
+        items = sorted(fdist.items(), key=lambda item: (-item[1], item[0]))
+    else:
+        items = fdist.most_common()
+    for extended_grapheme_cluster, count in items:
         names, codepoints = [], []
         for codepoint in extended_grapheme_cluster:
             name = ud.name(codepoint, None)
@@ -96,10 +136,22 @@ def main(expected_normalization, lower, xml, lvl, verbose, quiet, files):
     fdist = Counter()
     LOG.info("Aggregating counts of extended grapheme clusters in input.")
     for file in files:
-        for fragment in parse(file, xml):
-            if fragment is not None:
-                fragment = fragment.lower() if lower else fragment
-                fdist.update(count_extended_grapheme_clusters(fragment))
+        fragments = (
+            fragment.lower() if lower else fragment
+            for fragment in parse(file, xml)
+            if fragment is not None
+        )
+        for batch in chunk(fragments):
+            # updating directly from the matches avoids building an
+            # intermediate Counter per chunk, only to merge it right away
+            fdist.update(EGC_RE.findall(FRAGMENT_SEP.join(batch)))
+            fdist[FRAGMENT_SEP] -= len(batch) - 1
+    if not fdist[FRAGMENT_SEP]:
+        del fdist[FRAGMENT_SEP]
     if expected_normalization:
         check_normalization(fdist, expected_normalization)
-    print_fdist(fdist)
+    # NOTE: Ties are listed in order of first occurrence, except in XML, where
+    # they're sorted, because streaming the document visits text nodes and
+    # attributes in a different order than it appears in, e.g. an element's
+    # text only after the text of its children.
+    print_fdist(fdist, sort_ties=xml)
@@ -10,20 +10,24 @@ LOGLEVELS = [
         (v, k) for k, v in vars(log).items() if k.isupper() and isinstance(v, int)
     )
 ]
+BATCH_SIZE = 1024
 
 
-def print_position(lines, line_no):
-    lines = [line.strip(" \n").split("\t") for line in lines]
+def zip_position(lines, line_no):
+    # only the first attribute needs to be looked at, the rest of each line
+    # can be copied over as is
+    lines = [line.strip(b" \r\n").partition(b"\t") for line in lines]
     word = lines[0][0]
     position = [word]
-    for i, line in enumerate(lines):
-        assert line[0] == word, (
-            f"Expected first attribute {word} but got {line[0]} in vertical "
-            f"#{i+1} at line #{line_no+1}. Are you sure the verticals "
-            "represent the same corpus?"
+    for i, (first, sep, rest) in enumerate(lines):
+        assert first == word, (
+            f"Expected first attribute {word.decode(errors='replace')} but got "
+            f"{first.decode(errors='replace')} in vertical #{i+1} at line "
+            f"#{line_no+1}. Are you sure the verticals represent the same corpus?"
         )
-        position.extend(line[1:])
-    print("\t".join(position))
+        position += sep, rest
+    position.append(b"\n")
+    return b"".join(position)
 
 
 @cli.command()
@@ -36,7 +40,7 @@ def print_position(lines, line_no):
 )
 @cli.option("--verbose", "-v", help="(Repeatedly) increase logging level.", count=True)
 @cli.option("--quiet", "-q", help="(Repeatedly) decrease logging level.", count=True)
-@cli.argument("files", type=cli.File("rt", encoding="utf-8"), nargs=-1)
+@cli.argument("files", type=cli.File("rb"), nargs=-1)
 def main(lvl, verbose, quiet, files):
     """Zip verticals together.
 
@@ -51,11 +55,26 @@ def main(lvl, verbose, quiet, files):
     log.basicConfig(
         level=lvl, format="[%(asctime)s {}:%(levelname)s] %(message)s".format(NAME)
     )
-    files = files if files else (cli.File("rt", encoding="utf-8")("-"),)
+    # NOTE: Work with bytes throughout, there's no need to decode and re-encode
+    # the input just to shuffle columns around.
+    files = files if files else (cli.File("rb")("-"),)
+    out = cli.get_binary_stream("stdout")
     LOG.info(f"Zipping the following vertical files: {files}")
-    for line_no, lines in enumerate(zip(*files)):
-        if any("\t" in line for line in lines):
-            print_position(lines, line_no)
-        else:
-            print(lines[0].strip(" \n"))
+    # collect output lines and write them out in batches, which is cheaper than
+    # one write call per line
+    batch = []
+    try:
+        for line_no, lines in enumerate(zip(*files)):
+            if any(b"\t" in line for line in lines):
+                batch.append(zip_position(lines, line_no))
+            else:
+                batch.append(lines[0].strip(b" \r\n") + b"\n")
+            if len(batch) >= BATCH_SIZE:
+                out.write(b"".join(batch))
+                batch.clear()
+    finally:
+        # NOTE: Flush whatever was zipped successfully even if a mismatch
+        # aborts the run, so that the partial output is the same as with
+        # unbatched writes.
+        out.write(b"".join(batch))
     LOG.info("Done.")
@@ -1,6 +1,13 @@
 """Tokenizing, tagging and parsing text with UDPipe.
 
 """
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+import multiprocessing
+from operator import attrgetter
+import os
 import warnings
 
 from ufal import udpipe
@@ -46,12 +53,22 @@ class Model:
     """
 
     def __init__(self, model_path):
-        self._model = udpipe.Model.load(str(model_path))
+        self._model_path = str(model_path)
+        self._model = udpipe.Model.load(self._model_path)
         if self._model is None:
             raise RuntimeError(f"Unable to load model from {model_path!r}!")
         self._default = self._model.DEFAULT
 
-    def process(self, text, *, tag=True, parse=True, in_format=None, out_format=None):
+    def process(
+        self,
+        text,
+        *,
+        tag=True,
+        parse=True,
+        in_format=None,
+        out_format=None,
+        reuse_sentence=False,
+    ):
         """Process input text, yielding sentences one by one.
 
         The text is always at least tokenized, and optionally morphologically
@@ -68,6 +85,17 @@ class Model:
         :type in_format: None or str
         :param out_format: Output format (cf. below for possible values).
         :type out_format: None or str
+        :param reuse_sentence: Yield the same :class:`ufal.udpipe.Sentence`
+            object over and over, refilled with each new sentence, instead of
+            creating a new one every time. This saves some allocations, but it
+            means you can't hold on to the yielded sentences, you have to be
+            done with each one before asking for the next. In particular, all
+            the items of e.g. ``list(model.process(text, reuse_sentence=True))``
+            are one and the same object, which is cleared out by the time the
+            list is complete. Only relevant when ``out_format`` is ``None``;
+            otherwise, the sentence is never handed over to you, so it's always
+            reused.
+        :type reuse_sentence: bool
 
         The input text is a string in one of the following formats (specified
         by ``in_format``):
@@ -97,20 +125,18 @@ class Model:
         <http://ufal.mff.cuni.cz/udpipe/api-reference>`__.
 
         """
-        if in_format is None:
-            in_format = self._model.newTokenizer(self._default)
-        else:
-            in_format = udpipe.InputFormat.newInputFormat(in_format)
-            if in_format is None:
-                raise RuntimeError(f"Cannot create input format {in_format!r}.")
-
+        in_format = self._new_input_format(in_format)
         if out_format is not None:
-            out_format = udpipe.OutputFormat.newOutputFormat(out_format)
-            if out_format is None:
-                raise RuntimeError(f"Cannot create output format {out_format!r}.")
+            out_format = _new_output_format(out_format)
 
+        # NOTE: The SWIG binding only accepts str here, not bytes. There's no
+        # point in trying to save on encoding though: CPython caches the UTF-8
+        # representation on the str object itself the first time it's
+        # requested, so processing the same text repeatedly only encodes it
+        # once anyway.
         in_format.setText(text)
         error = udpipe.ProcessingError()
+        reuse_sentence = reuse_sentence or out_format is not None
         sent = udpipe.Sentence()
         while in_format.nextSentence(sent, error):
             if tag:
@@ -121,7 +147,160 @@ class Model:
                 yield sent
             else:
                 yield out_format.writeSentence(sent)
+            if reuse_sentence:
+                sent.clear()
+            else:
+                sent = udpipe.Sentence()
+        if error.occurred():
+            raise UdpipeError(error.message)
+        if out_format is not None:
+            end = out_format.finishDocument()
+            if end != "":
+                yield end
+
+    def process_batched(
+        self,
+        text,
+        *,
+        batch_size=64,
+        tag=True,
+        parse=True,
+        in_format=None,
+        out_format="conllu",
+    ):
+        """Process input text, yielding serialized sentences in batches.
+
+        Like :meth:`process`, but instead of handing each sentence back to the
+        caller as soon as it's been processed, ``batch_size`` sentences are
+        read, tagged and parsed, and then serialized into a single string. This
+        saves a round trip through the generator (and the Python overhead that
+        comes with it) per sentence, at the cost of holding a whole batch of
+        sentences in memory at once. Don't expect miracles though: most of the
+        time is spent tagging and parsing inside UDPipe itself, which batching
+        doesn't change.
+
+        Since the output is always serialized, ``out_format`` can't be
+        ``None``. For the possible values of ``in_format`` and ``out_format``,
+        as well as the remaining arguments, see :meth:`process`.
+
+        :param batch_size: Number of sentences per batch.
+        :type batch_size: int
+        :return: A generator of strings, each corresponding to a batch of
+            serialized sentences. One final additional string may contain any
+            closing markup, if required by the output format.
+
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size!r}.")
+        in_format = self._new_input_format(in_format)
+        out_format = _new_output_format(out_format)
+
+        in_format.setText(text)
+        error = udpipe.ProcessingError()
+        next_sentence = in_format.nextSentence
+        while True:
+            batch = []
             sent = udpipe.Sentence()
+            while len(batch) < batch_size and next_sentence(sent, error):
+                batch.append(sent)
+                sent = udpipe.Sentence()
+            if not batch:
+                break
+            if tag:
+                for sent in batch:
+                    self.tag(sent)
+            if parse:
+                for sent in batch:
+                    self.parse(sent)
+            yield "".join(map(out_format.writeSentence, batch))
+        if error.occurred():
+            raise UdpipeError(error.message)
+        end = out_format.finishDocument()
+        if end != "":
+            yield end
+
+    def process_parallel(
+        self,
+        text,
+        *,
+        workers=None,
+        chunk=256,
+        tag=True,
+        parse=True,
+        in_format=None,
+        out_format="conllu",
+    ):
+        """Process input text, tagging and parsing in multiple processes.
+
+        The text is split into sentences in the current process, and chunks of
+        ``chunk`` sentences are then handed over to a pool of ``workers``
+        processes (by default, as many as there are CPUs) for tagging and
+        parsing. Results are yielded in the original order, one chunk at a
+        time: if ``out_format`` is ``None``, as individual sentences, like
+        with :meth:`process`, otherwise as a single string per chunk, like with
+        :meth:`process_batched`.
+
+        If forking is the default way of starting processes on your platform
+        (e.g. on Linux, up to Python 3.13), worker processes share the already
+        loaded model with the current process. Otherwise, each worker has to
+        load the model again from its original path, which must therefore
+        still be accessible.
+
+        At most two chunks per worker are read ahead of the results yielded so
+        far, so memory use doesn't grow with the size of the input. If you stop
+        iterating early (or an exception is raised), chunks which haven't
+        started processing yet are cancelled.
+
+        This only pays off on larger inputs: sentences are shipped back and
+        forth between processes serialized as CoNLL-U, and starting the
+        workers takes time too.
+
+        For the possible values of ``in_format`` and ``out_format``, as well as
+        the remaining arguments, see :meth:`process`.
+
+        :param workers: Number of worker processes.
+        :type workers: None or int
+        :param chunk: Number of sentences sent to a worker at once.
+        :type chunk: int
+
+        """
+        if chunk < 1:
+            raise ValueError(f"chunk must be positive, got {chunk!r}.")
+        in_format = self._new_input_format(in_format)
+        if out_format is not None:
+            out_format = _new_output_format(out_format)
+
+        # NOTE: Only fork where it's the default anyway. Some platforms which
+        # support it (e.g. macOS) avoid it by default because forking a process
+        # with native libraries loaded is unsafe there.
+        mp_context = multiprocessing.get_context()
+        model = self if mp_context.get_start_method() == "fork" else self._model_path
+        in_format.setText(text)
+        error = udpipe.ProcessingError()
+        executor = ProcessPoolExecutor(
+            workers, mp_context=mp_context, initializer=_init_worker, initargs=(model,)
+        )
+        try:
+            process_chunk = partial(_process_chunk, tag=tag, parse=parse)
+            chunks = _serialize_chunks(in_format, error, chunk)
+            # NOTE: Unlike executor.map, which would consume (and serialize)
+            # the entire input up front, keep only a bounded window of chunks
+            # in flight, refilled as results are handed back in order.
+            pending = deque(
+                executor.submit(process_chunk, conllu)
+                for conllu in islice(chunks, 2 * (workers or os.cpu_count() or 1))
+            )
+            while pending:
+                conllu = pending.popleft().result()
+                if (next_conllu := next(chunks, None)) is not None:
+                    pending.append(executor.submit(process_chunk, next_conllu))
+                sents = load(conllu)
+                if out_format is None:
+                    yield from sents
+                else:
+                    yield "".join(map(out_format.writeSentence, sents))
+        finally:
+            executor.shutdown(cancel_futures=True)
         if error.occurred():
             raise UdpipeError(error.message)
         if out_format is not None:
@@ -129,6 +308,11 @@ class Model:
             if end != "":
                 yield end
 
+    def _new_input_format(self, in_format):
+        if in_format is None:
+            return self._model.newTokenizer(self._default)
+        return _new_input_format(in_format)
+
     def tag(self, sent):
         """Perform morphological tagging on sentence.
 
@@ -160,25 +344,88 @@ class Model:
         self._model.parse(sent, self._default)
 
 
-def load(corpus, in_format="conllu"):
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model if isinstance(model, Model) else Model(model)
+
+
+def _process_chunk(conllu, *, tag, parse):
+    out_format = _new_output_format("conllu")
+    sents = []
+    for sent in load(conllu):
+        if tag:
+            _worker_model.tag(sent)
+        if parse:
+            _worker_model.parse(sent)
+        sents.append(out_format.writeSentence(sent))
+    return "".join(sents)
+
+
+def _serialize_chunks(in_format, error, chunk):
+    # sentences are passed between processes as CoNLL-U, which round-trips all
+    # of their annotation, unlike the SWIG objects, which can't be pickled
+    out_format = _new_output_format("conllu")
+    sent = udpipe.Sentence()
+    sents = []
+    while in_format.nextSentence(sent, error):
+        sents.append(out_format.writeSentence(sent))
+        sent.clear()
+        if len(sents) == chunk:
+            yield "".join(sents)
+            sents = []
+    if sents:
+        yield "".join(sents)
+
+
+# NOTE: It's tempting to cache input/output formats by name, but they're
+# stateful (setText, finishDocument, per-document markup), so e.g. two
+# generators returned by load or dump would trample each other's state if they
+# shared one. And caching just the lookup of the constructor doesn't buy
+# anything: newInputFormat/newOutputFormat take about a quarter of a
+# microsecond, most of which is the unavoidable Python/C++ round trip.
+def _new_input_format(name):
+    in_format = udpipe.InputFormat.newInputFormat(name)
+    if in_format is None:
+        raise RuntimeError(f"Cannot create input format {name!r}.")
+    return in_format
+
+
+def _new_output_format(name):
+    out_format = udpipe.OutputFormat.newOutputFormat(name)
+    if out_format is None:
+        raise RuntimeError(f"Cannot create output format {name!r}.")
+    return out_format
+
+
+def load(corpus, in_format="conllu", *, reuse_sentence=False):
     """Load corpus in input format.
 
     :param corpus: The data to load.
     :type corpus: str
     :param in_format: Cf. the documentation of :meth:`Model.process`.
     :type in_format: str
+    :param reuse_sentence: Yield the same sentence object over and over,
+        refilled with each new sentence. As a consequence, e.g. ``list(load(...,
+        reuse_sentence=True))`` contains the same (cleared out) object many
+        times over, not the individual sentences. Cf. the documentation of
+        :meth:`Model.process`.
+    :type reuse_sentence: bool
     :return: A generator of sentences (:class:`ufal.udpipe.Sentence`).
 
     """
-    in_format = udpipe.InputFormat.newInputFormat(in_format)
-    if in_format is None:
-        raise RuntimeError(f"Cannot create input format {in_format!r}.")
+    in_format = _new_input_format(in_format)
     in_format.setText(corpus)
     error = udpipe.ProcessingError()
     sent = udpipe.Sentence()
     while in_format.nextSentence(sent, error):
         yield sent
-        sent = udpipe.Sentence()
+        if reuse_sentence:
+            sent.clear()
+        else:
+            sent = udpipe.Sentence()
     if error.occurred():
         raise UdpipeError(error.message)
 
@@ -195,9 +442,7 @@ def dump(sent_or_sents, out_format="conllu"):
         by the output format.
 
     """
-    out_format = udpipe.OutputFormat.newOutputFormat(out_format)
-    if out_format is None:
-        raise RuntimeError(f"Cannot create output format {out_format!r}.")
+    out_format = _new_output_format(out_format)
 
     if isinstance(sent_or_sents, udpipe.Sentence):
         yield out_format.writeSentence(sent_or_sents)
@@ -209,23 +454,40 @@ def dump(sent_or_sents, out_format="conllu"):
         yield end
 
 
-def _pprint_token(token, printer, cycle):
-    cls_name = type(token).__name__
-    if cycle:
-        return printer.text(f"{cls_name}(...)")
-    elif PPRINT_DIGEST and token.form == "<root>":
-        return printer.text(f"{cls_name}(id={token.id}, <root>)")
-    indent = len(cls_name) + 1
-    with printer.group(indent, f"{cls_name}(", ")"):
-        i = 0
-        for attr in globals()[cls_name.upper() + "_ATTRS"]:
-            val = getattr(token, attr)
-            if not PPRINT_DIGEST or val != "" and val != -1:
-                if i:
-                    printer.text(",")
-                    printer.breakable()
-                printer.text(f"{attr}={val!r}")
-                i += 1
+def _token_pprinter(cls, attrs):
+    # IPython's pretty printer already dispatches on type, so instead of
+    # figuring out the token type all over again on each call, create a
+    # specialized printer for each type, with everything that can be figured
+    # out without looking at the token itself (its class name, and the label
+    # and getter of each of its attributes) computed up front
+    cls_name = cls.__name__
+    attrs = tuple((f"{attr}=", attrgetter(attr)) for attr in attrs)
+    opening = cls_name + "("
+    indent = len(opening)
+    cycle_text = opening + "...)"
+
+    def pprint_token(token, printer, cycle):
+        if cycle:
+            return printer.text(cycle_text)
+        elif PPRINT_DIGEST and token.form == "<root>":
+            return printer.text(f"{opening}id={token.id}, <root>)")
+        with printer.group(indent, opening, ")"):
+            i = 0
+            for label, get in attrs:
+                val = get(token)
+                if not PPRINT_DIGEST or val != "" and val != -1:
+                    if i:
+                        printer.text(",")
+                        printer.breakable()
+                    printer.text(label + repr(val))
+                    i += 1
+
+    return pprint_token
+
+
+_pprint_word = _token_pprinter(udpipe.Word, WORD_ATTRS)
+_pprint_multiword_token = _token_pprinter(udpipe.MultiwordToken, MULTIWORDTOKEN_ATTRS)
+_pprint_empty_node = _token_pprinter(udpipe.EmptyNode, EMPTYNODE_ATTRS)
 
 
 def _pprint_sent(sent, printer, cycle):
@@ -293,9 +555,9 @@ def pprint_config(*, digest=True):
 
 
 def _register_pprinters(formatter):
-    formatter.for_type(udpipe.Word, _pprint_token)
-    formatter.for_type(udpipe.MultiwordToken, _pprint_token)
-    formatter.for_type(udpipe.EmptyNode, _pprint_token)
+    formatter.for_type(udpipe.Word, _pprint_word)
+    formatter.for_type(udpipe.MultiwordToken, _pprint_multiword_token)
+    formatter.for_type(udpipe.EmptyNode, _pprint_empty_node)
     formatter.for_type(udpipe.Sentence, _pprint_sent)
     formatter.for_type(udpipe.Comments, _pprint_seq)
     formatter.for_type(udpipe.Words, _pprint_seq)
@@ -3,12 +3,14 @@
 """
 import builtins
 from contextlib import contextmanager
-import inspect
+from functools import lru_cache
 import sys
-from types import FrameType
+import threading
+from types import FrameType, ModuleType
 import typing as t
 
-import numpy as np
+if t.TYPE_CHECKING:
+    import numpy as np
 
 
 #
@@ -16,20 +18,26 @@ import numpy as np
 
 GlobalsDict = dict[str, t.Any]
 
+# NOTE: Taken from a code object rather than contextlib.__file__, so that it's
+# guaranteed to match the co_filename of contextlib's frames on the stack.
+_CONTEXTLIB_FNAME = contextmanager.__code__.co_filename
+
 
 def _get_user_frame(start_frame: FrameType) -> FrameType:
-    ctxlib_fname = None
+    in_ctxlib = False
     # walk up the call stack, skipping frames in this file and in
     # contextlib, to reach the user code that triggered `with no_globals(): ...`
-    # and whose globals we want to tamper with
-    for frame_info in inspect.getouterframes(start_frame):
-        if ctxlib_fname is None and frame_info.filename.endswith("contextlib.py"):
-            ctxlib_fname = frame_info.filename
-        elif ctxlib_fname is not None and frame_info.filename != ctxlib_fname:
-            break
-    else:
-        raise RuntimeError("User's frame not found in call stack")
-    return frame_info.frame
+    # and whose globals we want to tamper with; NOTE: we only need the file
+    # names, so don't use inspect.getouterframes, which also looks up source
+    # code context for each frame on the stack
+    frame: FrameType | None = start_frame
+    while frame is not None:
+        if frame.f_code.co_filename == _CONTEXTLIB_FNAME:
+            in_ctxlib = True
+        elif in_ctxlib:
+            return frame
+        frame = frame.f_back
+    raise RuntimeError("User's frame not found in call stack")
 
 
 def _enrich_name_error(err: NameError, pruned_globals: GlobalsDict):
@@ -45,6 +53,94 @@ def _enrich_name_error(err: NameError, pruned_globals: GlobalsDict):
         )
 
 
+def _acquire_monitoring_tool_id() -> int | None:
+    # sys.monitoring is only available from Python 3.12 onwards, and IDs 3 and
+    # 4 are the ones not reserved for a specific kind of tool; if both are
+    # taken (e.g. by nested no_globals blocks), we'll have to make do with
+    # sys.settrace
+    monitoring = getattr(sys, "monitoring", None)
+    if monitoring is None:
+        return None
+    for tool_id in (3, 4):
+        try:
+            monitoring.use_tool_id(tool_id, "corpy.util.no_globals")
+        except ValueError:
+            continue
+        return tool_id
+    return None
+
+
+def _prune_on_first_call(
+    prune_globals: t.Callable[[GlobalsDict], GlobalsDict], tool_id: int
+) -> t.Generator[None, None, None]:
+    # Same as the sys.settrace-based implementation in no_globals, but using
+    # sys.monitoring: only the first function call is intercepted, and after
+    # that, only returns (or yields, as with the "return" tracing event) from
+    # the function that was called (which, unlike a tracing function, doesn't
+    # slow down any of the other calls made in the meantime), plus exceptions
+    # unwinding the stack, which should be rare.
+    monitoring = sys.monitoring  # type: ignore[attr-defined]
+    events = monitoring.events
+    thread_id = threading.get_ident()
+    pruned_frame: FrameType | None = None
+    globals_to_prune = pruned_globals = {}
+    done = False
+
+    def finish():
+        nonlocal done
+        if done:
+            return
+        done = True
+        globals_to_prune.update(pruned_globals)
+        monitoring.set_events(tool_id, 0)
+        if pruned_frame is not None:
+            monitoring.set_local_events(tool_id, pruned_frame.f_code, 0)
+        for event in (
+            events.PY_START,
+            events.PY_RETURN,
+            events.PY_YIELD,
+            events.PY_UNWIND,
+        ):
+            monitoring.register_callback(tool_id, event, None)
+        monitoring.free_tool_id(tool_id)
+
+    def on_start(code, offset):
+        nonlocal pruned_frame, globals_to_prune, pruned_globals
+        # unlike sys.settrace, sys.monitoring isn't per-thread
+        if threading.get_ident() != thread_id:
+            return
+        pruned_frame = sys._getframe(1)
+        globals_to_prune = pruned_frame.f_globals
+        pruned_globals = prune_globals(globals_to_prune)
+        monitoring.set_events(tool_id, events.PY_UNWIND)
+        monitoring.set_local_events(tool_id, code, events.PY_RETURN | events.PY_YIELD)
+
+    def on_return(code, offset, retval):
+        # the function might be recursive, so check that it's actually the
+        # original call that's returning
+        if sys._getframe(1) is pruned_frame:
+            finish()
+
+    def on_unwind(code, offset, exc):
+        if sys._getframe(1) is pruned_frame:
+            if isinstance(exc, NameError):
+                _enrich_name_error(exc, pruned_globals)
+            finish()
+
+    monitoring.register_callback(tool_id, events.PY_START, on_start)
+    monitoring.register_callback(tool_id, events.PY_RETURN, on_return)
+    monitoring.register_callback(tool_id, events.PY_YIELD, on_return)
+    monitoring.register_callback(tool_id, events.PY_UNWIND, on_unwind)
+    monitoring.set_events(tool_id, events.PY_START)
+    try:
+        yield
+    finally:
+        # in case the first call hasn't returned by the time we get here, e.g.
+        # if there was no call in the block, in which case the first call was
+        # contextlib's __exit__, which in turn resumed us
+        finish()
+
+
 @contextmanager
 def no_globals(
     *,
@@ -101,9 +197,10 @@ def no_globals(
         irrespective of the other options.
     :param strict: In non-strict mode, allow global variables in the current
         scope, i.e. only start pruning within function calls. NOTE: This is
-        slower because it requires tracing the function calls. Also, when using
-        `no_globals` as a function decorator, non-strict probably doesn't make
-        sense.
+        slower because it requires tracing the function calls (though much less
+        so on Python 3.12+, where only the first call and its return need to be
+        intercepted). Also, when using `no_globals` as a function decorator,
+        non-strict probably doesn't make sense.
     :param restore_builtins: Make sure that the conventional names for built-in
         objects point to those objects (beginners often use ``list`` or
         ``sorted`` as variable names).
@@ -121,49 +218,65 @@ def no_globals(
     if bw_intersection:
         raise ValueError(f"Blacklist and whitelist overlap: {bw_intersection}")
 
+    # prefixes of names to keep, for a single str.startswith check; keeping
+    # all names starting with an underscore covers dunder names as well
+    if not sunder:
+        keep_prefixes: tuple[str, ...] = ("_",)
+    elif not dunder:
+        keep_prefixes = ("__",)
+    else:
+        keep_prefixes = ()
+
     def prune_globals(globals_to_prune: GlobalsDict) -> GlobalsDict:
         pruned_globals = {}
+        # NOTE: Looking up the builtins in the module's dict is much cheaper
+        # than getattr(builtins, name, None), which has to raise and swallow an
+        # AttributeError for each global which isn't a builtin. It's looked up
+        # at call time because e.g. IPython adds builtins of its own.
+        get_builtin = vars(builtins).get
+        # NOTE: Both lists are empty by default, and checking a local for None
+        # is cheaper than looking up each name in an empty set.
+        blacklist_ = blacklist or None
+        whitelist_ = whitelist or None
         # NOTE: We'll be updating the globals dict as part of the loop, so we need
-        # to store the items in a list, otherwise our iterator would be invalidated
-        # by the update.
-        for name, value in list(globals_to_prune.items()):
-            remove, restore = True, False
-            builtin = getattr(builtins, name, None)
-
-            if name in blacklist:
-                pass
-            elif name in whitelist:
-                remove = False
-            elif restore_builtins and builtin is not None:
-                restore = True
-            elif not modules and inspect.ismodule(value):
-                remove = False
-            elif not callables and callable(value):
-                remove = False
-            elif not upper and name.isupper():
-                remove = False
-            elif not dunder and name.startswith("__"):
-                remove = False
-            elif not sunder and name.startswith("_"):
-                remove = False
-
-            if remove:
+        # to take a snapshot of the names, otherwise our iterator would be
+        # invalidated by the update. Names only, not items, which would mean
+        # allocating a tuple per global.
+        for name in tuple(globals_to_prune):
+            if blacklist_ is not None and name in blacklist_:
                 pruned_globals[name] = globals_to_prune.pop(name)
-            if restore:
+            elif whitelist_ is not None and name in whitelist_:
+                pass
+            elif restore_builtins and (builtin := get_builtin(name)) is not None:
+                pruned_globals[name] = globals_to_prune[name]
                 globals_to_prune[name] = builtin
+            else:
+                value = globals_to_prune[name]
+                # NOTE: Inlined instead of being factored out into a predicate
+                # function, which would cost a function call per global.
+                if not (
+                    (not modules and isinstance(value, ModuleType))
+                    or (not callables and callable(value))
+                    or (not upper and name.isupper())
+                    or name.startswith(keep_prefixes)
+                ):
+                    pruned_globals[name] = globals_to_prune.pop(name)
 
         return pruned_globals
 
-    current_frame = inspect.currentframe()
-    if current_frame is None:
-        raise RuntimeError("Your Python has no stack frame support in the interpreter")
-    user_frame = _get_user_frame(current_frame)
+    # NOTE: Start from the caller's frame, our own generator frame is of no
+    # interest. Using sys._getframe also means not having to import inspect,
+    # which is one of the heavier modules to import in the stdlib.
+    user_frame = _get_user_frame(sys._getframe(1))
 
-    # TODO: Maybe try an alternative approach: replace user_frame.f_globals with
-    # a dict subclass with a customized getter which will check the position of
-    # the current frame in the call stack before allowing access? This could
-    # result in both strict and non-strict mode using the same code, which would
-    # be good.
+    # NOTE: An alternative approach would be to replace user_frame.f_globals
+    # with a dict subclass with a customized getter which would check the
+    # position of the current frame in the call stack before allowing access.
+    # Unfortunately, the globals of a frame or function can't be swapped out for
+    # a different object, and even if they could, any non-dict globals mapping
+    # disables CPython's fast path for global lookups, so every single global
+    # (and builtin!) lookup would go through a Python-level __getitem__, which
+    # would be even slower than tracing.
 
     globals_to_prune = pruned_globals = {}
     if strict:
@@ -176,6 +289,8 @@ def no_globals(
             raise err
         finally:
             globals_to_prune.update(pruned_globals)
+    elif (tool_id := _acquire_monitoring_tool_id()) is not None:
+        yield from _prune_on_first_call(prune_globals, tool_id)
     else:
         pruned = False
 
@@ -226,32 +341,236 @@ LongestCommonSubstring.start2.__doc__ += "; substring start index in second stri
 LongestCommonSubstring.length.__doc__ += "; substring length"  # type: ignore
 
 
+# Below this length of `str2`, filling the table one cell at a time in Python
+# is cheaper than paying NumPy's per-call overhead on every row.
+_VECTORIZE_MIN_LEN = 32
+# Above this length of both strings, streaming one through a suffix automaton
+# of the other beats any variant of the quadratic table.
+_AUTOMATON_MIN_LEN = 64
+# With Numba available, the compiled table beats the automaton up to roughly
+# this many cells.
+_NUMBA_MAX_CELLS = 1 << 22
+
+
+def _codepoints(str_: str) -> "np.ndarray":
+    # NOTE: NumPy is imported lazily throughout this section, so that users of
+    # no_globals don't have to pay for importing it
+    import numpy as np
+
+    # NOTE: Any str is valid input, including one with lone surrogates, which
+    # are encoded as is, just like any other code point.
+    return np.frombuffer(
+        str_.encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32
+    )
+
+
+# end index in first string, end index in second string, length
+_Streak = tuple[int, int, int]
+
+
+def _lcs_rows_py(str1: str, str2: str) -> _Streak:
+    # each row of the table depends only on the previous one, so there's no
+    # need to keep the rest of it around; tracking the first longest streak in
+    # row-major order as we go also saves an argmax over the full table at the
+    # end, and gives the same answer
+    len2 = len(str2)
+    prev = [0] * (len2 + 1)
+    best_len = best_i = best_j = 0
+    for i, c1 in enumerate(str1):
+        curr = [0] * (len2 + 1)
+        for j, c2 in enumerate(str2):
+            if c1 == c2:
+                streak = curr[j + 1] = prev[j] + 1
+                if streak > best_len:
+                    best_len, best_i, best_j = streak, i, j
+        # on inputs this short, the full cutoff used by the other
+        # implementations costs more than it saves, but once all of str2 has
+        # matched, nothing can beat that
+        if best_len == len2:
+            break
+        prev = curr
+    return best_i, best_j, best_len
+
+
+def _lcs_rows_np(str1: str, str2: str) -> _Streak:
+    import numpy as np
+
+    len1, len2 = len(str1), len(str2)
+    codes2 = _codepoints(str2)
+    prev = np.zeros(len2 + 1, dtype=np.int32)
+    curr = np.zeros_like(prev)
+    best_len = best_i = best_j = 0
+    for i, c1 in enumerate(_codepoints(str1)):
+        # the whole row in one go: extend the streaks ending on the previous
+        # row's diagonal neighbors wherever the characters match, reset them
+        # elsewhere
+        np.multiply(prev[:-1] + 1, codes2 == c1, out=curr[1:])
+        j = int(curr.argmax())
+        row_max = int(curr[j])
+        if row_max > best_len:
+            best_len, best_i, best_j = row_max, i, j - 1
+        # a streak can only get longer by one per remaining row (and never
+        # longer than str2), so once the longest streak on the current row plus
+        # the number of remaining rows can't beat the best streak so far, we
+        # can stop; only strictly longer streaks count, so that the first of
+        # several equally long ones wins
+        if best_len >= min(row_max + len1 - i - 1, len2):
+            break
+        prev, curr = curr, prev
+    return best_i, best_j, best_len
+
+
+@lru_cache(maxsize=None)
+def _numba_lcs_kernel() -> t.Callable | None:
+    # Numba is optional and slow to import, so only try to import it on first
+    # use
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    import numpy as np
+
+    @njit(cache=True, boundscheck=False)
+    def lcs_kernel(str1, str2):
+        # same as _lcs_rows_py, just compiled
+        len1, len2 = str1.shape[0], str2.shape[0]
+        prev = np.zeros(len2 + 1, dtype=np.int32)
+        curr = np.zeros(len2 + 1, dtype=np.int32)
+        best_len = best_i = best_j = 0
+        for i in range(len1):
+            c1 = str1[i]
+            for j in range(len2):
+                if c1 == str2[j]:
+                    streak = prev[j] + 1
+                    curr[j + 1] = streak
+                    if streak > best_len:
+                        best_len, best_i, best_j = streak, i, j
+                else:
+                    curr[j + 1] = 0
+            # same cutoff as in _lcs_rows_np, but only scanning the row for
+            # its longest streak once the cutoff is within reach, so as not to
+            # slow down the inner loop
+            if best_len == len2:
+                break
+            rows_left = len1 - i - 1
+            if best_len >= rows_left and best_len >= curr.max() + rows_left:
+                break
+            prev, curr = curr, prev
+        return best_i, best_j, best_len
+
+    return lcs_kernel
+
+
+class _SuffixAutomaton:
+    """Suffix automaton of a string, built incrementally (Blumer et al., 1985).
+
+    Each state stands for a set of substrings which share their end positions
+    in the string; ``firstpos`` records the first of those end positions.
+
+    """
+
+    __slots__ = ("length", "link", "trans", "firstpos", "last")
+
+    def __init__(self, str_: str):
+        self.length = [0]
+        self.link = [-1]
+        self.trans: list[dict[str, int]] = [{}]
+        self.firstpos = [-1]
+        self.last = 0
+        for pos, char in enumerate(str_):
+            self.extend(char, pos)
+
+    def extend(self, char: str, pos: int):
+        length, link, trans, firstpos = (
+            self.length,
+            self.link,
+            self.trans,
+            self.firstpos,
+        )
+        cur = len(length)
+        length.append(length[self.last] + 1)
+        link.append(0)
+        trans.append({})
+        firstpos.append(pos)
+        p = self.last
+        while p != -1 and char not in trans[p]:
+            trans[p][char] = cur
+            p = link[p]
+        if p != -1:
+            q = trans[p][char]
+            if length[p] + 1 == length[q]:
+                link[cur] = q
+            else:
+                clone = len(length)
+                length.append(length[p] + 1)
+                link.append(link[q])
+                trans.append(trans[q].copy())
+                firstpos.append(firstpos[q])
+                while p != -1 and trans[p].get(char) == q:
+                    trans[p][char] = clone
+                    p = link[p]
+                link[q] = link[cur] = clone
+        self.last = cur
+
+
+def _lcs_automaton(str1: str, str2: str) -> _Streak:
+    automaton = _SuffixAutomaton(str2)
+    length, link, trans = automaton.length, automaton.link, automaton.trans
+    state = streak = 0
+    best_len = best_rows_left = best_state = 0
+    # for each position in str1, find the longest substring ending there which
+    # also occurs in str2, following suffix links to shorten it on mismatch
+    len1, len2 = len(str1), len(str2)
+    for rows_left, char in zip(range(len1 - 1, -1, -1), str1):
+        while state and char not in trans[state]:
+            state = link[state]
+            streak = length[state]
+        state = trans[state].get(char, 0)
+        streak = streak + 1 if state else 0
+        # strictly greater, so that ties resolve to the earliest end in str1,
+        # and firstpos then gives the earliest end in str2, same as the DP
+        if streak > best_len:
+            best_len, best_rows_left, best_state = streak, rows_left, state
+        # same cutoff as in _lcs_rows_np
+        if best_len >= streak + rows_left or best_len == len2:
+            break
+    best_i = len1 - 1 - best_rows_left
+    return best_i, automaton.firstpos[best_state], best_len
+
+
 def longest_common_substring(str1: str, str2: str) -> LongestCommonSubstring | None:
     """Find longest common substring between `str1` and `str2`, if it exists.
 
     .. note::
 
        Uses an efficient dynamic programming algorithm which runs in
-       :math:`O(len(str1) \\times len(str2))` time. Still, it computes the full
-       table describing *all* substrings, which I'm sure could be avoided. For
-       instance, we could keep track of the longest streak and zero down on it /
-       exit early as soon as there's too little of the strings remaining to
-       yield any competitors. But since this function is meant to be used on
-       words as input, which tend to be fairly short, the added overhead is
-       probably not worth it, not to mention the potential headaches caused by
-       a more complicated implementation.
+       :math:`O(len(str1) \\times len(str2))` time. For longer strings, each row
+       of the table is computed as a single vectorized NumPy operation, which
+       cuts down on interpreter overhead considerably. Only two rows of the
+       table are kept in memory at any one time, and the computation stops
+       early as soon as there's too little of the strings remaining to yield
+       any competitors to the longest streak found so far.
+
+       When both strings are long, the table is skipped altogether in favor of
+       a suffix automaton, which finds the longest common substring in
+       :math:`O(len(str1) + len(str2))` time.
+
+       If `Numba <https://numba.pydata.org/>`__ is installed, the table is
+       filled in by compiled code instead, which is considerably faster.
 
     """
-    table = np.zeros((len(str1), len(str2)), dtype=int)
-    for i, c1 in enumerate(str1):
-        for j, c2 in enumerate(str2):
-            if c1 == c2:
-                streak = 0 if not (i and j) else table[i - 1, j - 1]
-                table[i, j] = 1 + streak
-    i, j = np.unravel_index(table.argmax(), table.shape)
-    length = table[i, j]
+    lcs_kernel = _numba_lcs_kernel()
+    if lcs_kernel is not None and len(str1) * len(str2) <= _NUMBA_MAX_CELLS:
+        i, j, length = lcs_kernel(_codepoints(str1), _codepoints(str2))
+    elif min(len(str1), len(str2)) > _AUTOMATON_MIN_LEN:
+        i, j, length = _lcs_automaton(str1, str2)
+    elif len(str2) < _VECTORIZE_MIN_LEN:
+        i, j, length = _lcs_rows_py(str1, str2)
+    else:
+        i, j, length = _lcs_rows_np(str1, str2)
     if length > 0:
         return LongestCommonSubstring(i - length + 1, j - length + 1, length)
+    return None
 
 
 # vi: set foldmethod=marker:
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import pytest
+
+MODELS_DIR = Path(__file__).parent.parent
+TAGGER_PATH = MODELS_DIR / "czech-morfflex-pdt.tagger"
+UDPIPE_MODEL_PATH = MODELS_DIR / "czech-pdt-ud.udpipe"
+
+
+@pytest.fixture(scope="session")
+def tagger():
+    # loading the model is expensive, so share it among all the tests which
+    # need it; tests which don't (the majority) don't even import MorphoDiTa
+    if not TAGGER_PATH.exists():
+        pytest.skip(f"MorphoDiTa model {TAGGER_PATH.name} not found, see `make models`")
+    from corpy.morphodita import Tagger
+
+    return Tagger(TAGGER_PATH)
+
+
+@pytest.fixture(scope="session")
+def udpipe_model():
+    # the same goes for the UDPipe model
+    if not UDPIPE_MODEL_PATH.exists():
+        pytest.skip(
+            f"UDPipe model {UDPIPE_MODEL_PATH.name} not found, see `make models`"
+        )
+    from corpy.udpipe import Model
+
+    return Model(UDPIPE_MODEL_PATH)
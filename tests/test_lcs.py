@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from corpy import util
+from corpy.util import LongestCommonSubstring, longest_common_substring
+
+
+def brute_force_lcs(str1, str2):
+    best = None
+    for i in range(len(str1)):
+        for j in range(len(str2)):
+            length = 0
+            while (
+                i + length < len(str1)
+                and j + length < len(str2)
+                and str1[i + length] == str2[j + length]
+            ):
+                length += 1
+            # prefer earliest end in str1, then earliest end in str2
+            if length and (
+                best is None
+                or length > best.length
+                or length == best.length
+                and (i + length, j + length)
+                < (best.start1 + best.length, best.start2 + best.length)
+            ):
+                best = LongestCommonSubstring(i, j, length)
+    return best
+
+
+def random_pairs(alphabet, max_len, n=200):
+    rnd = random.Random(0)
+    for _ in range(n):
+        yield (
+            "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, max_len))),
+            "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, max_len))),
+        )
+
+
+def numba_kernel(str1, str2):
+    kernel = util._numba_lcs_kernel()
+    if kernel is None:
+        pytest.skip("Numba not installed")
+    return kernel(util._codepoints(str1), util._codepoints(str2))
+
+
+@pytest.mark.parametrize(
+    "impl",
+    [util._lcs_rows_py, util._lcs_rows_np, util._lcs_automaton, numba_kernel],
+)
+@pytest.mark.parametrize("alphabet", ["ab", "abcdefgh", "žluťoučký kůň", "ab\udcff"])
+def test_impls_match_brute_force(impl, alphabet):
+    for str1, str2 in random_pairs(alphabet, 30):
+        expected = brute_force_lcs(str1, str2)
+        end1, end2, length = impl(str1, str2)
+        if expected is None:
+            assert length == 0
+        else:
+            assert (end1 - length + 1, end2 - length + 1, length) == expected
+
+
+@pytest.mark.parametrize(
+    "str1,str2,expected",
+    [
+        ("nadělat", "dělat", (2, 0, 5)),
+        ("abcabc", "abc", (0, 0, 3)),
+        ("xyz", "abc", None),
+        ("a" * 100 + "b", "b" + "a" * 100, (0, 1, 100)),
+        ("x" * 5 + "abc" * 12 + "x" * 300, "abc" * 12, (5, 0, 36)),
+        # lone surrogates
+        ("a\udcffb", "x\udcffb", (1, 1, 2)),
+        ("\udcff" * 40 + "b", "b" + "\udcff" * 40, (0, 1, 40)),
+    ],
+)
+def test_longest_common_substring(str1, str2, expected):
+    assert longest_common_substring(str1, str2) == expected
@@ -119,3 +119,21 @@ def test_tag_two_strings_intermittently_with_same_tagger():
     assert next(iter2).word == "Pes"
     assert next(iter2).word == "oknem"
     assert next(iter1).word == "leze"
+
+
+def test_tag_as_tuple():
+    tagger = Tagger("./czech-morfflex-pdt.tagger")
+    tokens = list(tagger.tag("Kočka leze dírou.", as_tuple=True))
+    assert tokens == [
+        ("Kočka", "kočka", "NNFS1-----A----"),
+        ("leze", "lézt", "VB-S---3P-AAI--"),
+        ("dírou", "díra", "NNFS7-----A----"),
+        (".", ".", "Z:-------------"),
+    ]
+    assert all(type(tok) is tuple for tok in tokens)
+    sents = list(tagger.tag([["Pes", "oknem", "."]], sents=True, as_tuple=True))
+    assert [Token(*tok) for tok in sents[0]] == [
+        Token(word="Pes", lemma="pes_^(zvíře)", tag="NNMS1-----A----"),
+        Token(word="oknem", lemma="okno", tag="NNNS7-----A----"),
+        Token(word=".", lemma=".", tag="Z:-------------"),
+    ]
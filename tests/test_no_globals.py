@@ -4,24 +4,36 @@ from IPython.utils.capture import capture_output
 
 from corpy.util import no_globals
 
+import fake_re
+
+
+SETUP_CODE = compile(
+    """
+foo = 1
+def bar():
+    print(foo)
+""",
+    "<setup>",
+    "exec",
+)
+
 
 @pytest.fixture(scope="module")
 def module_ip():
-    yield start_ipython()
+    ip = start_ipython()
+    ip.run_line_magic("load_ext", "corpy")
+    yield ip
 
 
 @pytest.fixture(scope="function")
 def ip(module_ip):
-    module_ip.run_line_magic("load_ext", "corpy")
-    module_ip.run_cell(
-        """
-foo = 1
-def bar():
-    print(foo)
-"""
-    )
+    # NOTE: Executing the setup directly in the user namespace and then just
+    # removing the names it defined is much faster than going through run_cell
+    # and %reset -f, which among other things triggers a garbage collection.
+    exec(SETUP_CODE, module_ip.user_ns)
     yield module_ip
-    module_ip.run_line_magic("reset", "-f")
+    for name in ("foo", "bar"):
+        module_ip.user_ns.pop(name, None)
 
 
 def test_blacklist_works():
@@ -70,6 +82,18 @@ def test_no_strict():
     assert "'foo'" in exc_info.exconly()
 
 
+def test_no_strict_restores_globals_when_generator_yields():
+    global foo
+    foo = ()
+
+    def gen():
+        yield 1
+
+    with no_globals(strict=False):
+        for _ in gen():
+            assert foo == ()
+
+
 def test_no_strict_only_prunes_globals_in_direct_children_of_calling_scope():
     # As in, if I call foo(), then only the global environment of foo should be
     # pruned (and of course, also that of any function which happens to share
@@ -78,8 +102,6 @@ def test_no_strict_only_prunes_globals_in_direct_children_of_calling_scope():
     # functions from imported modules is generally undesirable. E.g. re.match
     # uses a global _cache -- we want that to remain accessible, flagging access
     # to this _cache as a mistake is spurious.
-    import fake_re
-
     def func_i_wish_to_debug():
         fake_re.match()
 
@@ -182,49 +204,29 @@ FOO_NOT_DEFINED_ERR = (
 )
 
 
-def test_cell_magic_strict(ip):
-    with capture_output() as captured:
-        ip.run_cell("%%no_globals\nprint(foo)")
-    assert captured.stdout.endswith(FOO_NOT_DEFINED_ERR)
-    assert not captured.stderr
-
-    with capture_output() as captured:
-        ip.run_cell("%%no_globals\nbar()")
-    assert captured.stdout.endswith(FOO_NOT_DEFINED_ERR)
-    assert not captured.stderr
-
-
-def test_cell_magic_non_strict(ip):
-    with capture_output() as captured:
-        ip.run_cell("%%no_globals -X\nprint(foo)")
-    assert captured.stdout == "1\n"
-    assert not captured.stderr
-
-    with capture_output() as captured:
-        ip.run_cell("%%no_globals -X\nbar()")
-    assert captured.stdout.endswith(FOO_NOT_DEFINED_ERR)
-    assert not captured.stderr
-
-
-def test_line_magic_strict(ip):
-    with capture_output() as captured:
-        ip.run_cell("%no_globals print(foo)")
-    assert captured.stdout.endswith(FOO_NOT_DEFINED_ERR)
-    assert not captured.stderr
-
+@pytest.mark.parametrize(
+    "cell",
+    [
+        "%%no_globals\nprint(foo)",
+        "%%no_globals\nbar()",
+        "%%no_globals -X\nbar()",
+        "%no_globals print(foo)",
+        "%no_globals bar()",
+        "%no_globals -X bar()",
+    ],
+)
+def test_magic_hides_globals(ip, cell):
     with capture_output() as captured:
-        ip.run_cell("%no_globals bar()")
+        ip.run_cell(cell)
     assert captured.stdout.endswith(FOO_NOT_DEFINED_ERR)
     assert not captured.stderr
 
 
-def test_line_magic_non_strict(ip):
+@pytest.mark.parametrize(
+    "cell", ["%%no_globals -X\nprint(foo)", "%no_globals -X print(foo)"]
+)
+def test_magic_non_strict_keeps_globals_in_calling_scope(ip, cell):
     with capture_output() as captured:
-        ip.run_cell("%no_globals -X print(foo)")
+        ip.run_cell(cell)
     assert captured.stdout == "1\n"
     assert not captured.stderr
-
-    with capture_output() as captured:
-        ip.run_cell("%no_globals -X bar()")
-    assert captured.stdout.endswith(FOO_NOT_DEFINED_ERR)
-    assert not captured.stderr
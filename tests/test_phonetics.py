@@ -1,11 +1,6 @@
 import pytest
-from pathlib import Path
 
 from corpy.phonetics import cs
-from corpy.morphodita import Tagger
-
-SCRIPT_DIR = Path(__file__).parent
-TAGGER = Tagger(SCRIPT_DIR.parent / "czech-morfflex-pdt.tagger")
 
 
 def test_voicing_assimilation_over_word_boundaries():
@@ -63,6 +58,7 @@ class TestHiatus:
 
     def test_hiatus_by_default_between_high_front_vowels(self):
         assert cs.transcribe("Indii") == [("I", "n", "d", "I", "j", "I")]
+        assert cs.transcribe("Indií") == [("I", "n", "d", "I", "j", "i:")]
 
     def test_hiatus_can_be_optionally_forced(self):
         assert cs.transcribe("hiát", hiatus=True) == [("h\\", "I", "j", "a:", "t")]
@@ -83,6 +79,8 @@ def test_other_csps(orth, phon):
     "orth,phon",
     [
         ("denně", [("d", "E", "J", "E")]),
+        # the collapsed grapheme can also be part of a digraph
+        ("Anně", [("a", "J", "E")]),
         # short vowels are exempt for obvious reasons:
         ("pootevřít", [("p", "o", "o", "t", "E", "v", "P\\", "i:", "t")]),
         ("neexistoval", [("n", "E", "E", "g", "z", "I", "s", "t", "o", "v", "a", "l")]),
@@ -189,6 +187,41 @@ def test_exceptions(orth, phon):
     assert cs.transcribe(orth) == phon
 
 
+@pytest.mark.skipif(
+    cs.SUBSTR_AUTOMATON is None, reason="optional pyahocorasick not installed"
+)
+@pytest.mark.parametrize(
+    "word", ["nejneobhospodařovávatelnějšími", "chrochtat", "dítě", "kůň", "a"]
+)
+def test_substr2phones_automaton_matches_trie(word):
+    assert list(cs._substr2phones_automaton(word)) == list(cs._substr2phones_trie(word))
+
+
+@pytest.mark.parametrize("word", ["αβ", "dαm", "chα"])
+def test_substr2phones_unexpected_substring(word):
+    with pytest.raises(ValueError) as exc_info:
+        list(cs._substr2phones(word))
+    assert exc_info.match("Unexpected substring in input: 'α'")
+
+
+@pytest.mark.parametrize(
+    "token,expected",
+    [
+        ("máš", True),
+        ("d-štít", True),
+        ("-", False),
+        ("?hlad-", False),
+        ("123", False),
+        ("„", False),
+        # alphabetic according to Unicode, even though str.isalpha disagrees
+        ("Ⅻ", True),
+        ("a\u0345", True),
+    ],
+)
+def test_is_transcribable(token, expected):
+    assert cs._is_transcribable(token) == expected
+
+
 @pytest.mark.parametrize(
     "tokens,pros_boundaries,matrix,to_transcribe",
     [
@@ -263,6 +296,22 @@ class TestUserAddedHyphen:
 
 
 class TestSmartHandlingOfVowelAcrossMorphemeBoundary:
+    @pytest.mark.parametrize(
+        "lower,lemma,boundary",
+        [
+            ("neurazit", "urazit", 2),
+            ("vyextrahovat", "extrahovat", 2),
+            # boundary not before <u> or after high front vowel
+            ("neurazit", "razit", None),
+            # common substring doesn't start at beginning of lemma
+            ("doutník", "dutý", None),
+            # common substring starts at beginning of word
+            ("neuron", "neuron", None),
+        ],
+    )
+    def test_prefix_boundary(self, lower, lemma, boundary):
+        assert cs._prefix_boundary(lower, lemma) == boundary
+
     @pytest.mark.parametrize(
         "orth,phon",
         [
@@ -285,8 +334,8 @@ class TestSmartHandlingOfVowelAcrossMorphemeBoundary:
             ("neuron", [("n", "E_u", "r", "o", "n")]),
         ],
     )
-    def test_with_tagger(self, orth, phon):
-        assert cs.transcribe(orth, tagger=TAGGER) == phon
+    def test_with_tagger(self, orth, phon, tagger):
+        assert cs.transcribe(orth, tagger=tagger) == phon
 
     # TODO: Enable these when a new MorphoDiTa model is released, with a DeriNet
     # which has useful derivations for them.
@@ -2,21 +2,26 @@ import pytest
 from pathlib import Path
 
 from corpy.phonetics import cs
-from corpy.morphodita import Tagger
 
 SCRIPT_DIR = Path(__file__).parent
-TAGGER = Tagger(SCRIPT_DIR.parent / "czech-morfflex-pdt.tagger")
-CASES = [
-    case.split("\t")
-    for case in (SCRIPT_DIR / "test_phonetics_regressions.tsv")
-    .read_text(encoding="utf-8")
-    .splitlines()[1:]
-]
+
+
+def load_cases():
+    # stream the file line by line rather than reading it into a string and
+    # splitting that into another list of lines
+    with open(SCRIPT_DIR / "test_phonetics_regressions.tsv", encoding="utf-8") as file:
+        next(file)
+        for line in file:
+            orth, phon = line.rstrip("\n").split("\t")
+            yield orth, phon
+
+
+CASES = list(load_cases())
 
 
 @pytest.mark.parametrize("orth,phon_expected", CASES)
-def test_regressions(orth, phon_expected):
+def test_regressions(orth, phon_expected, tagger):
     """Test all transcriptions that worked at some point."""
-    phon = cs.transcribe(orth, alphabet="cnc", hiatus=True, tagger=TAGGER)
-    phon = " ".join(phone for word in phon for phone in word)
+    phon = cs.transcribe(orth, alphabet="cnc", hiatus=True, tagger=tagger)
+    phon = " ".join([phone for word in phon for phone in word])
     assert phon == phon_expected
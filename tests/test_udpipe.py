@@ -0,0 +1,97 @@
+import pytest
+from ufal import udpipe
+
+from corpy.udpipe import Model, dump, load
+
+HORIZONTAL = "".join(
+    f"Sentence number {i} has {'a few more ' * (i % 3)}words .\n" for i in range(23)
+)
+CONLLU = """\
+# sent_id = 1
+# text = Hello world!
+1	Hello	hello	INTJ	_	_	0	root	_	_
+2	world	world	NOUN	_	_	1	vocative	_	SpaceAfter=No
+3	!	!	PUNCT	_	_	1	punct	_	SpaceAfter=No
+
+# sent_id = 2
+# text = Bye.
+1	Bye	bye	INTJ	_	_	0	root	_	SpaceAfter=No
+2	.	.	PUNCT	_	_	1	punct	_	SpaceAfter=No
+
+"""
+
+
+@pytest.fixture(scope="session")
+def blank_model(tmp_path_factory):
+    # a model with no tokenizer, tagger or parser, which takes no time to train
+    # and is enough for processing pre-tokenized input with tag=False and
+    # parse=False; it still has to be an actual file, so that process_parallel
+    # workers can reload it if they aren't forked
+    error = udpipe.ProcessingError()
+    model = udpipe.Trainer.train(
+        "morphodita_parsito",
+        udpipe.Sentences(),
+        udpipe.Sentences(),
+        "none",
+        "none",
+        "none",
+        error,
+    )
+    assert not error.occurred(), error.message
+    path = tmp_path_factory.mktemp("udpipe") / "blank.udpipe"
+    path.write_bytes(model)
+    return Model(path)
+
+
+def process_all_ways(model, text, **kwargs):
+    expected = "".join(model.process(text, out_format="conllu", **kwargs))
+    batched = "".join(model.process_batched(text, batch_size=5, **kwargs))
+    parallel = "".join(model.process_parallel(text, workers=2, chunk=3, **kwargs))
+    return expected, batched, parallel
+
+
+def test_process_batched_and_parallel_match_process(blank_model):
+    expected, batched, parallel = process_all_ways(
+        blank_model, HORIZONTAL, tag=False, parse=False, in_format="horizontal"
+    )
+    assert expected.count("# sent_id") == 23
+    assert batched == expected
+    assert parallel == expected
+
+
+def test_process_parallel_native_output(blank_model):
+    kwargs = dict(tag=False, parse=False, in_format="horizontal")
+    expected = "".join(dump(blank_model.process(HORIZONTAL, **kwargs)))
+    sents = blank_model.process_parallel(
+        HORIZONTAL, workers=2, chunk=3, out_format=None, **kwargs
+    )
+    assert "".join(dump(sents)) == expected
+
+
+def test_load_dump_round_trip_with_reuse_sentence():
+    assert "".join(dump(load(CONLLU, reuse_sentence=True))) == CONLLU
+
+
+@pytest.mark.parametrize("tag,parse", [(True, False), (True, True)])
+def test_process_batched_and_parallel_match_process_with_model(
+    udpipe_model, tag, parse
+):
+    text = "Kočka leze dírou, pes oknem. Nebude-li pršet, nezmoknem.\n" * 10
+    expected, batched, parallel = process_all_ways(
+        udpipe_model, text, tag=tag, parse=parse
+    )
+    assert batched == expected
+    assert parallel == expected
+
+
+def test_reuse_sentence_yields_the_same_object():
+    # this is the documented contract of reuse_sentence: the sentences can't
+    # be collected, only processed one at a time
+    reused = list(load(CONLLU, reuse_sentence=True))
+    assert len(reused) == 2
+    assert reused[0] is reused[1]
+    assert reused[0].empty()
+
+    fresh = list(load(CONLLU))
+    assert fresh[0] is not fresh[1]
+    assert "".join(dump(fresh)) == CONLLU
@@ -1,3 +1,6 @@
+from collections import Counter
+import os
+
 import pytest
 import numpy as np
 
@@ -29,34 +32,34 @@ def test_optimize_dimensions():
     assert vis._optimize_dimensions((500, 500), True, 800) == (500, 500, 1)
 
 
-def test_elliptical_mask():
-    assert np.all(
-        vis._elliptical_mask(5, 5)
-        == np.array(
+@pytest.mark.parametrize(
+    "width,height,expected",
+    [
+        (
+            5,
+            5,
             [
                 [255, 255, 255, 255, 255],
                 [255, 0, 0, 0, 255],
                 [255, 0, 0, 0, 255],
                 [255, 0, 0, 0, 255],
                 [255, 255, 255, 255, 255],
-            ]
-        )
-    )
-    assert np.all(
-        vis._elliptical_mask(10, 5)
-        == np.array(
+            ],
+        ),
+        (
+            10,
+            5,
             [
                 [255, 255, 255, 255, 255, 255, 255, 255, 255, 255],
                 [255, 0, 0, 0, 0, 0, 0, 0, 0, 0],
                 [255, 0, 0, 0, 0, 0, 0, 0, 0, 0],
                 [255, 0, 0, 0, 0, 0, 0, 0, 0, 0],
                 [255, 255, 255, 255, 255, 255, 255, 255, 255, 255],
-            ]
-        )
-    )
-    assert np.all(
-        vis._elliptical_mask(5, 10)
-        == np.array(
+            ],
+        ),
+        (
+            5,
+            10,
             [
                 [255, 255, 255, 255, 255],
                 [255, 0, 0, 0, 255],
@@ -68,43 +71,54 @@ def test_elliptical_mask():
                 [255, 0, 0, 0, 255],
                 [255, 0, 0, 0, 255],
                 [255, 0, 0, 0, 255],
-            ]
-        )
-    )
-
-
-def test_wordcloud():
-    import os
-    from collections import Counter
-
-    # smaller than fast_limit**2
+            ],
+        ),
+    ],
+)
+def test_elliptical_mask(width, height, expected):
+    # unlike np.all(mask == expected), this also checks that the shapes match
+    # instead of broadcasting, and shows the mismatching elements on failure
+    np.testing.assert_array_equal(vis._elliptical_mask(width, height), expected)
+
+
+@pytest.fixture(scope="module")
+def os_freqs():
+    # most of the checks below only care about the size of the output, which
+    # doesn't depend on the words, so they can make do with a handful of
+    # precomputed frequencies; word placement is what makes wordclouds slow
+    return dict(Counter(os.__doc__.split()).most_common(10))
+
+
+@pytest.mark.parametrize(
+    "size,kwargs,expected",
+    [
+        # smaller than fast_limit**2
+        ((400, 800), {}, (400, 800)),
+        ((800, 400), {}, (800, 400)),
+        # larger than fast_limit**2
+        ((813, 845), {}, (813, 844)),
+        ((813, 845), {"fast": False}, (813, 845)),
+        # smaller than custom fast_limit
+        ((813, 845), {"fast_limit": 829}, (813, 845)),
+        # using an elliptical mask doesn't affect output size
+        ((313, 345), {"rounded": True}, (313, 345)),
+    ],
+)
+def test_wordcloud_size(os_freqs, size, kwargs, expected):
+    im = vis.wordcloud(os_freqs, size, **kwargs).to_image()
+    assert (im.width, im.height) == expected
+
+
+def test_wordcloud_input_types():
     im = vis.wordcloud(os.__doc__).to_image()
     assert (im.width, im.height) == (400, 400)
-    im = vis.wordcloud(os.__doc__, (400, 800)).to_image()
-    assert (im.width, im.height) == (400, 800)
-    im = vis.wordcloud(os.__doc__, (800, 400)).to_image()
-    assert (im.width, im.height) == (800, 400)
-
-    # larger than fast_limit**2
-    im = vis.wordcloud(os.__doc__, (813, 845)).to_image()
-    assert (im.width, im.height) == (813, 844)
-    im = vis.wordcloud(os.__doc__, (813, 845), fast=False).to_image()
-    assert (im.width, im.height) == (813, 845)
-
-    # smaller than custom fast_limit
-    im = vis.wordcloud(os.__doc__, (813, 845), fast_limit=829).to_image()
-    assert (im.width, im.height) == (813, 845)
-
-    # different types of input
-    assert vis.wordcloud(os.__doc__.split())
-    assert vis.wordcloud(w for w in os.__doc__.split())
-    assert vis.wordcloud(Counter(os.__doc__.split()))
-
-    # using an elliptical mask doesn't affect output size
-    im = vis.wordcloud(os.__doc__, (313, 345), rounded=True).to_image()
-    assert (im.width, im.height) == (313, 345)
-
-    # exceptions
+    words = os.__doc__.split()
+    assert vis.wordcloud(words)
+    assert vis.wordcloud(w for w in words)
+    assert vis.wordcloud(Counter(words))
+
+
+def test_wordcloud_errors():
     with pytest.raises(ValueError) as exc_info:
         vis.wordcloud(None)
     assert (